@@ -1,3 +1,5 @@
 from .fable import (
     load,
+    loads,
+    load_iter,
 )
\ No newline at end of file
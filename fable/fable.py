@@ -1,40 +1,39 @@
 import sys
 import re
+import math
+import string
+from io import StringIO
 from pathlib import Path
 from dataclasses import dataclass
-from enum import Enum, auto
-from typing import Optional, Union, List, IO, Callable
+from enum import IntEnum
+from functools import lru_cache
+from itertools import takewhile
+from typing import Optional, Union, Any, List, Tuple, Iterable, Iterator, IO, Callable
 
 # compile each regex pattern once, reuse many times
-SPECIFICATION_PATTERN = re.compile(r'%%\s+(\d.\d.\d)')
+SPECIFICATION_PATTERN = re.compile(r'%%\s+(\d+)\.(\d+)\.(\d+)')
 
-# parse variable declarations of the form: <type> <name> <value>
-VARIABLE_DECLARATION_PATTERN = re.compile(r'^\s*(integer[\?]?|float[\?]?|string[\?]?|boolean[\?]?)\s+([a-zA-Z_\d]+)\s+(.+)$')
+# the characters allowed in variable and table names
+NAME_CHARACTERS = string.ascii_letters + string.digits + '_'
 
-# parse table declarations of the form: table <name> or table+ <name>
-TABLE_DECLARATION_PATTERN = re.compile(r'\s*(table[\+]?)\s+([a-zA-Z_\d]+)')
+# the keywords of table declarations of the form: table <name> or table+ <name>
+TABLE_TYPES = frozenset(('table', 'table+'))
 
-# parse values of defined `integer` types
-INTEGER_PATTERN = re.compile(r'\s*(\d+)')
-NULLABLE_INTEGER_PATTERN = re.compile(r'\s*(\d+|null)')
+# the first characters that can begin a declaration, any other line (comments,
+# blank lines) is skipped with a single set lookup instead of a regex match
+DECLARATION_START = frozenset('ifsbt \t')
 
-# parse values of defined `float` types
-FLOAT_PATTERN = re.compile(r'\s*([\+|\-]?[\d{3}_?]+\.?[\d{3}_?]*[e|E]?[\+\-]?[\d]*)')
-NULLABLE_FLOAT_PATTERN = re.compile(r'\s*([\+|\-]?[\d{3}_?]+\.?[\d{3}_?]*[e|E]?[\+\-]?[\d]*|null)')
-
-# parse values of defined `string` types
-STRING_PATTERN = re.compile(r'\s*(\".*\")')
-NULLABLE_STRING_PATTERN = re.compile(r'\s*(\".*\"|null)')
-
-# parse values of defined `boolean` types
-BOOLEAN_PATTERN = re.compile(r'\s*(true|false)')
-NULLABLE_BOOLEAN_PATTERN = re.compile(r'\s*(true|false|null)')
+# other (unsigned, lowercase) spellings of nan and inf that float() rejects
+NAN_SPELLINGS = frozenset(('nan%', 'nanq', 'nans', 'qnan', 'snan', 'nan.0', '1.#qnan', '1.#snan', '1.#ind'))
+INF_SPELLINGS = frozenset(('inf.0', '1.#inf'))
 
 class ParsingError(Exception):
     pass
 
 @dataclass
 class Version:
+    __slots__ = ('major', 'minor', 'patch')
+
     major: int
     minor: int
     patch: int
@@ -48,130 +47,160 @@ class Version:
 
         if match is None:
             return None
-        
-        major, minor, patch = match.group(1).split('.')
+
+        major, minor, patch = match.groups()
 
         return cls(int(major), int(minor), int(patch))
 
 @dataclass
 class Variable:
+    __slots__ = ('name', 'value')
+
     name: str
     value: Union[int, float, str, bool, None]
 
+    def __eq__(self, other):
+        # compare fields directly rather than through the generated tuple compare,
+        # keeping its identity check so the same `nan` object still compares equal
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.name == other.name and (self.value is other.value or self.value == other.value)
+
 @dataclass
 class Table:
+    __slots__ = ('name', 'header', 'values')
+
     name: str
     header: Optional[List[str]]
     values: List[List[Variable]]
 
 @dataclass
 class Error:
+    __slots__ = ('message', 'code')
+
     message: str
     code: int
 
-class ErrorCode(Enum):
-    PARSING_ERROR = auto()
-    NULLABLE_TYPE_ERROR = auto()
-    UNKNOWN_TYPE = auto()
-    TYPE_ERROR = auto()
+class ErrorCode(IntEnum):
+    PARSING_ERROR = 1
+    NULLABLE_TYPE_ERROR = 2
+    UNKNOWN_TYPE = 3
+    TYPE_ERROR = 4
+
+def value_token(s: str) -> str:
+    # the first whitespace delimited token of a value, dropping any trailing comment
+    tokens = s.split(None, 1)
+    if len(tokens) == 0:
+        return ''
+    return tokens[0]
+
+def parse_integer_token(token: str, s: str) -> Union[int, Error]:
+    try:
+        return int(token)
+    except ValueError:
+        pass
+
+    # downcast float literals, e.g. 10.15 -> 10
+    try:
+        return int(float(token))
+    except (ValueError, OverflowError):
+        return Error(f'invalid literal for integer type: {s}', ErrorCode.TYPE_ERROR)
 
 def parse_integer(s: str) -> Union[int, Error]:
-    match = INTEGER_PATTERN.match(s)
-    if match is None:
-        return Error(f'invalid literal for integer type: {s}', ErrorCode.TYPE_ERROR)
-    return int(match.group(1))
+    return parse_integer_token(value_token(s), s)
 
 def parse_nullable_integer(s: str) -> Union[int, None, Error]:
-    match = NULLABLE_INTEGER_PATTERN.match(s)
-    if match is None:
-        return Error(f'invalid literal for integer type: {s}', ErrorCode.TYPE_ERROR)
-    
-    value = match.group(1)
-    if value == 'null':
+    token = value_token(s)
+    if token == 'null':
         return None
-    return int(value)
+    return parse_integer_token(token, s)
 
-def parse_float(s: str) -> Union[float, Error]:
-    match = FLOAT_PATTERN.match(s)
-    if match is None:
-        # check for nan/infs first
-        if 'nan' in s.lower():
-            return float('nan')
-        if 'inf' in s.lower():
-            return float('inf')
+def parse_non_numeric_float(token: str, s: str) -> Union[float, Error]:
+    # only reached once float() failed, so lowercase the value once
+    lowered = token.lower()
+    sign = lowered[:1]
+    unsigned = lowered[1:] if sign in ('+', '-') else lowered
 
-        # otherwise it's really an invalid value
-        return Error(f'invalid literal for float type: {s}', ErrorCode.TYPE_ERROR)
+    # check for other nan/inf spellings, e.g. NaNQ or 1.#SNAN
+    if unsigned in NAN_SPELLINGS:
+        return math.nan
+    if unsigned in INF_SPELLINGS:
+        if sign == '-':
+            return -math.inf
+        return math.inf
 
-    return float(match.group(1))
+    # otherwise it's really an invalid value
+    return Error(f'invalid literal for float type: {s}', ErrorCode.TYPE_ERROR)
+
+def parse_float(s: str) -> Union[float, Error]:
+    # float() natively handles signs, exponents, separators, nan and inf
+    token = value_token(s)
+    try:
+        return float(token)
+    except ValueError:
+        return parse_non_numeric_float(token, s)
 
 def parse_nullable_float(s: str) -> Union[float, None, Error]:
-    match = NULLABLE_FLOAT_PATTERN.match(s)
-    if match is None:
-        # check for nan/infs first
-        if 'nan' in s.lower():
-            return float('nan')
-        if 'inf' in s.lower():
-            return float('inf')
-
-        # otherwise it's really an invalid value
-        return Error(f'invalid literal for float type: {s}', ErrorCode.TYPE_ERROR)
-
-    value = match.group(1)
-    if value == 'null':
+    token = value_token(s)
+    if token == 'null':
         return None
-    return float(value)
+
+    try:
+        return float(token)
+    except ValueError:
+        return parse_non_numeric_float(token, s)
 
 def parse_string(s: str) -> Union[str, Error]:
-    match = STRING_PATTERN.match(s)
-    if match is None:
+    # a string runs from its opening quote to the next quote
+    value = s.lstrip()
+    end = value.find('"', 1)
+    if end < 0 or value[0] != '"':
         return Error(f'invalid literal for string type: {s}', ErrorCode.TYPE_ERROR)
-    return match.group(1).replace('"', '')
 
-def parse_nullable_string(s: str) -> Union[int, None, Error]:
-    match = NULLABLE_STRING_PATTERN.match(s)
-    if match is None:
+    # only whitespace or a comment may follow the closing quote
+    rest = value[end + 1:].lstrip()
+    if rest != '' and rest[0] != '#':
         return Error(f'invalid literal for string type: {s}', ErrorCode.TYPE_ERROR)
 
-    value = match.group(1)
-    if value == 'null':
+    return value[1:end]
+
+def parse_nullable_string(s: str) -> Union[str, None, Error]:
+    if value_token(s) == 'null':
         return None
-    return value.replace('"', '')
+    return parse_string(s)
 
 def parse_boolean(s: str) -> Union[bool, Error]:
-    match = BOOLEAN_PATTERN.match(s)
-    if match is None:
-        return Error(f'invalid literal for boolean type: {s}', ErrorCode.TYPE_ERROR)
-    value = match.group(1)
-    if value == 'true':
+    token = value_token(s)
+    if token == 'true':
         return True
-    return False
-
-def parse_nullable_boolean(s: str) -> Union[int, None, Error]:
-    match = NULLABLE_BOOLEAN_PATTERN.match(s)
-    if match is None:
-        return Error(f'invalid literal for boolean type: {s}', ErrorCode.TYPE_ERROR)
-    value = match.group(1)
-    if value == 'null':
-        return None
+    if token == 'false':
+        return False
+    return Error(f'invalid literal for boolean type: {s}', ErrorCode.TYPE_ERROR)
 
-    if value == 'true':
+def parse_nullable_boolean(s: str) -> Union[bool, None, Error]:
+    token = value_token(s)
+    if token == 'null':
+        return None
+    if token == 'true':
         return True
-    return False
+    if token == 'false':
+        return False
+    return Error(f'invalid literal for boolean type: {s}', ErrorCode.TYPE_ERROR)
+
+# map each declared type to its value parser, built once at import
+PARSE_FUNCS = {
+    'integer': parse_integer,
+    'integer?': parse_nullable_integer,
+    'float': parse_float,
+    'float?': parse_nullable_float,
+    'string': parse_string,
+    'string?': parse_nullable_string,
+    'boolean': parse_boolean,
+    'boolean?': parse_nullable_boolean
+}
 
 def parse_variable(type_: str, name: str, value: str) -> Union[Variable, Error]:
-    parse_funcs = {
-        'integer': parse_integer,
-        'integer?': parse_nullable_integer,
-        'float': parse_float,
-        'float?': parse_nullable_float,
-        'string': parse_string,
-        'string?': parse_nullable_string,
-        'boolean': parse_boolean,
-        'boolean?': parse_nullable_boolean
-    }
-
-    pfunc = parse_funcs.get(type_)
+    pfunc = PARSE_FUNCS.get(type_)
     if pfunc is None:
         return Error(f'unknown varirable type: {type_}', ErrorCode.UNKNOWN_TYPE)
 
@@ -184,79 +213,134 @@ def parse_variable(type_: str, name: str, value: str) -> Union[Variable, Error]:
 
     return Variable(name, val)
 
+def scan_declaration(s: str) -> Optional[List[str]]:
+    # split a declaration of the form <type> <name> <value> or table <name> into
+    # its keyword, name and remainder with a single C-level split, not a regex
+    parts = s.split(None, 2)
+    if len(parts) < 2:
+        return None
+
+    keyword = parts[0]
+    if keyword in PARSE_FUNCS:
+        if len(parts) < 3:
+            return None
+    elif keyword not in TABLE_TYPES:
+        return None
+
+    # stripping every allowed character only leaves an empty string for valid names
+    if parts[1].strip(NAME_CHARACTERS) != '':
+        return None
+
+    return parts
+
 def parse_variable_declaration(s: str) -> Union[None, Variable, Error]:
-    variable_match = VARIABLE_DECLARATION_PATTERN.match(s)
-    if variable_match is None:
+    parts = scan_declaration(s)
+    if parts is None or parts[0] not in PARSE_FUNCS:
         return None
 
-    type_ = variable_match.group(1)
-    name = variable_match.group(2)
-    value = variable_match.group(3)
+    type_, name, value = parts
     return parse_variable(type_, name, value)
 
-def table_type_parsers(s: str) -> List[Callable]:
-    parse_funcs = {
-        'integer': parse_integer,
-        'integer?': parse_nullable_integer,
-        'float': parse_float,
-        'float?': parse_nullable_float,
-        'string': parse_string,
-        'string?': parse_nullable_string,
-        'boolean': parse_boolean,
-        'boolean?': parse_nullable_boolean
-    }
+@lru_cache(maxsize=256)
+def lookup_table_types(types: str) -> Tuple[Optional[Callable], ...]:
+    return tuple(PARSE_FUNCS.get(t) for t in types.split(','))
+
+def table_type_parsers(s: str) -> Union[Tuple[Callable, ...], Error]:
+    # normalize the line so equivalent type lines share a single cache entry
     types = [x.strip() for x in s.strip().split(',')]
-    type_checks = [x for x in types if x in parse_funcs.keys()]
+    parsers = lookup_table_types(','.join(types))
 
-    # check for invalid type declarations in the table
-    if len(type_checks) < len(types):
-        msg = f'Unknown type(s) in table: {", ".join(set(types) - set(type_checks))}'
+    # check for invalid type declarations in the table, the error is built on
+    # each call so callers never share a cached (mutable) instance
+    if None in parsers:
+        unknown = {t for t, p in zip(types, parsers) if p is None}
+        msg = f'Unknown type(s) in table: {", ".join(unknown)}'
         return Error(msg, ErrorCode.UNKNOWN_TYPE)
 
-    return [parse_funcs[t] for t in types]
+    return parsers
 
 def parse_table_headers(s: str) -> List[str]:
     return [x.strip().replace('"', '') for x in s.strip().split(',')]
 
-def parse_table_row(s: str, parsers: List[Callable]) -> List[Union[int, float, str, bool, None]]:
-    row = [x.strip() for x in s.strip().split(',')]
+def parse_table_fields(row: List[str], parsers: Tuple[Callable, ...]) -> List[Union[int, float, str, bool, None]]:
     return [parse(r) for r, parse in zip(row, parsers)]
 
-def parse_table_declaration(s: str, io: IO) -> Union[None, Table, Error]:
-    # confirm this is a correct table definition
-    match = TABLE_DECLARATION_PATTERN.match(s)
-    if match is None:
-        return None
+def parse_table_row(s: str, parsers: Tuple[Callable, ...]) -> List[Union[int, float, str, bool, None]]:
+    row = [x.strip() for x in s.strip().split(',')]
+    return parse_table_fields(row, parsers)
 
+def parse_table_schema(table_type: str, name: str, io: IO) -> Tuple[Union[Tuple[Callable, ...], Error], Optional[List[str]]]:
     has_header = False
-    if match.group(1).endswith('+'):
+    if table_type.endswith('+'):
         has_header = True
 
-    name = match.group(2)
-    # now, consume the next line to get parsers for each table type
-    parsers = table_type_parsers(next(io))
-
-    # consume the header row if it exists
-    header = None
-    if has_header:
-        header = parse_table_headers(next(io))
-
-    # then consume and parse each row until encountering a blank line
-    s = next(io)
-    values = []
-    while s.strip() != '':
+    # now, consume the next line to get parsers for each table type, and the
+    # header row if it exists, either may be missing from a truncated document
+    try:
+        parsers = table_type_parsers(next(io))
+
+        header = None
+        if has_header:
+            header = parse_table_headers(next(io))
+    except StopIteration:
+        error = Error(f'unexpected end of document in table: {name}', ErrorCode.PARSING_ERROR)
+        return error, None
+
+    return parsers, header
+
+@lru_cache(maxsize=256)
+def compile_row_parser(parsers: Tuple[Callable, ...]) -> Callable[[List[str]], List[Union[int, float, str, bool, None]]]:
+    # generate a row parser specialized to the number of columns, which calls each
+    # column's parser directly instead of zipping the fields and parsers per row
+    n = len(parsers)
+    arguments = ', '.join(f'p{i}=p{i}' for i in range(n))
+    columns = ', '.join(f'p{i}(fields[{i}])' for i in range(n))
+    source = (
+        f'def parse_row(fields, {arguments}):\n'
+        f'    if len(fields) < {n}:\n'
+        f'        return parse_table_fields(fields, parsers)\n'
+        f'    return [{columns}]\n'
+    )
+
+    namespace = {f'p{i}': p for i, p in enumerate(parsers)}
+    namespace.update(parse_table_fields=parse_table_fields, parsers=parsers)
+    exec(source, namespace)
+    return namespace['parse_row']
+
+def iter_table_rows(lines: Iterable[str], parsers: Tuple[Callable, ...]) -> Iterator[List[Union[int, float, str, bool, None]]]:
+    parse_row = compile_row_parser(parsers)
+
+    # lazily parse each row, every field parser already skips surrounding whitespace
+    # so a plain split is enough (and has no field size limit, unlike `csv`)
+    for s in lines:
         try:
-            row = parse_table_row(s, parsers)
+            values = parse_row(s.split(','))
         except:
-            return Error(f'error parsing row: {s}', ErrorCode.PARSING_ERROR)
-        values.append(row)
-        try:
-            s = next(io)
-        except StopIteration:
-            return Table(name, header, values)
+            error = Error(f'error parsing row: {s.strip()}', ErrorCode.PARSING_ERROR)
+            raise ParsingError(error) from None
+        yield values
+
+def parse_table(table_type: str, name: str, io: IO) -> Union[Table, Error]:
+    parsers, header = parse_table_schema(table_type, name, io)
+    if isinstance(parsers, Error):
+        return parsers
+
+    # then consume and parse the block of rows up to the next blank line
+    try:
+        values = list(iter_table_rows(takewhile(str.strip, io), parsers))
+    except ParsingError as e:
+        return e.args[0]
 
     return Table(name, header, values)
 
+def parse_table_declaration(s: str, io: IO) -> Union[None, Table, Error]:
+    # confirm this is a correct table definition
+    parts = scan_declaration(s)
+    if parts is None or parts[0] not in TABLE_TYPES:
+        return None
+
+    return parse_table(parts[0], parts[1], io)
+
 def load(io: IO) -> dict:
     """
     Deserialize the contents of a text or binary Fable file (that supports `.read()`)
@@ -279,43 +363,107 @@ def load(io: IO) -> dict:
     results = {}
     errors = []
 
-    # document frontmatter
-    s = next(io)
-    if s.startswith('%%'):
-        # TODO: used for forward compatibility with future parsers
-        version = Version.parse_specification(s)
-
+    # the `%%` frontmatter line is skipped along with every other line that
+    # cannot begin a declaration
     for s in io:
+        if s[:1] not in DECLARATION_START:
+            continue
+
+        parts = scan_declaration(s)
+        if parts is None:
+            continue
+
         # try parsing variable definitions
-        maybe_variable = parse_variable_declaration(s)
-        if maybe_variable is not None:
+        if parts[0] in PARSE_FUNCS:
+            maybe_variable = parse_variable(*parts)
             if isinstance(maybe_variable, Error):
                 errors.append(maybe_variable)
                 continue
-            
+
             # otherwise store the parsed key-value pair
             results[maybe_variable.name] = maybe_variable.value
             continue
 
-        # try parsing table definitions
-        if s.strip().startswith('table'):
-            maybe_table = parse_table_declaration(s, io)
-            if maybe_table is not None:
-                if isinstance(maybe_table, Error):
-                    errors.append(maybe_table)
-                    continue
+        # otherwise it is a table definition
+        maybe_table = parse_table(parts[0], parts[1], io)
+        if isinstance(maybe_table, Error):
+            errors.append(maybe_table)
+            continue
 
-                # otherwise store the table
-                results[maybe_table.name] = {
-                    'header': maybe_table.header,
-                    'values': maybe_table.values
-                }
+        # otherwise store the table
+        results[maybe_table.name] = {
+            'header': maybe_table.header,
+            'values': maybe_table.values
+        }
 
     if len(errors) != 0:
         raise ParsingError(*errors)
 
     return results
 
+def load_iter(io: IO) -> Iterator[Tuple[str, Any]]:
+    """
+    Lazily deserialize the contents of a Fable file, yielding `(name, value)`
+    pairs in document order instead of building a single `dict`.
+
+    Variables are converted as in `load`. Tables are yielded as a `dict` with a
+    `header` and a `values` iterator that parses each row on demand, so a table
+    never needs to be held in memory in full. Rows must be consumed before
+    advancing to the next pair, any rows left unconsumed are skipped.
+
+    Unlike `load`, a `ParsingError` is raised as soon as an error is found.
+
+    Parameters:
+        io: a `.read()`-supporting file-like object containing a Fable document
+    """
+    # the `%%` frontmatter line is skipped along with every other line that
+    # cannot begin a declaration
+    for s in io:
+        if s[:1] not in DECLARATION_START:
+            continue
+
+        parts = scan_declaration(s)
+        if parts is None:
+            continue
+
+        if parts[0] in PARSE_FUNCS:
+            variable = parse_variable(*parts)
+            if isinstance(variable, Error):
+                raise ParsingError(variable)
+
+            yield variable.name, variable.value
+            continue
+
+        parsers, header = parse_table_schema(parts[0], parts[1], io)
+        if isinstance(parsers, Error):
+            raise ParsingError(parsers)
+
+        lines = takewhile(str.strip, io)
+        yield parts[1], {
+            'header': header,
+            'values': iter_table_rows(lines, parsers)
+        }
+
+        # skip past any rows the caller did not consume
+        for _ in lines:
+            pass
+
+def loads(s: Union[str, bytes]) -> dict:
+    """
+    Deserialize a `str` or `bytes` instance containing a Fable document to a
+    Python `dict` using the same conversion table as `load`.
+
+    The whole buffer is decoded once up front, instead of decoding each line
+    as it is read from a file.
+
+    Parameters:
+        s: a `str`, `bytes` or `bytearray` instance containing a Fable document
+    """
+    if isinstance(s, (bytes, bytearray)):
+        s = s.decode('utf-8')
+
+    return load(StringIO(s, newline=None))
+
 # example usage
 if __name__ == '__main__':
     import pprint
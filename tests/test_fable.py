@@ -1,19 +1,73 @@
+import copy
+import pickle
+from io import StringIO
 from math import isnan, isinf
 
+import pytest
+
 from fable.fable import (
     Version,
     Variable,
     Error,
     ErrorCode,
-    parse_variable_declaration
+    ParsingError,
+    parse_variable_declaration,
+    load,
+    loads,
+    load_iter
 )
 
+DOCUMENT = '''%% 0.2.0
+# a comment
+integer my_int 10
+string? name null
+
+table+ students
+integer,string,float?
+"id","name","test_score"
+0,"Jane Doe",98.1
+1,"John Doe",null
+
+float my_float 3.14
+'''
+
+EXPECTED = {
+    'my_int': 10,
+    'name': None,
+    'students': {
+        'header': ['id', 'name', 'test_score'],
+        'values': [[0, 'Jane Doe', 98.1], [1, 'John Doe', None]]
+    },
+    'my_float': 3.14
+}
+
 class TestVersion:
     def test_version_specification_parser(self):
         s = '%% 0.2.0'
         version = Version.parse_specification(s)
         assert version == Version(0, 2, 0)
 
+    def test_multi_digit_version(self):
+        s = '%% 1.12.03  # comment'
+        version = Version.parse_specification(s)
+        assert version == Version(1, 12, 3)
+
+    def test_copy_and_pickle(self):
+        version = Version(1, 2, 3)
+        assert copy.copy(version) == version
+        assert copy.deepcopy(version) == version
+        assert pickle.loads(pickle.dumps(version)) == version
+
+class TestError:
+    def test_copy_and_pickle(self):
+        error = Error('invalid literal for integer type: x', ErrorCode.TYPE_ERROR)
+        assert copy.copy(error) == error
+        assert copy.deepcopy(error) == error
+        assert pickle.loads(pickle.dumps(error)) == error
+
+        exc = pickle.loads(pickle.dumps(ParsingError(error)))
+        assert exc.args == (error,)
+
 class TestIntegerDeclarations:
     def test_generic_integer(self):
         s = 'integer my_int 10'
@@ -40,6 +94,21 @@ class TestIntegerDeclarations:
         result = parse_variable_declaration(s)
         assert result == Variable('my_int', 10)
 
+    def test_signed_integer(self):
+        s = 'integer my_int -3'
+        result = parse_variable_declaration(s)
+        assert result == Variable('my_int', -3)
+
+    def test_downcast_exponent_to_int(self):
+        s = 'integer my_int 1e3'
+        result = parse_variable_declaration(s)
+        assert result == Variable('my_int', 1000)
+
+    def test_catch_trailing_characters(self):
+        s = 'integer my_int 10abc'
+        result = parse_variable_declaration(s)
+        assert result.code == ErrorCode.TYPE_ERROR
+
     def test_catch_type_error_1(self):
         s = 'integer my_int "hello world"'
         result = parse_variable_declaration(s)
@@ -76,6 +145,11 @@ class TestFloatDeclarations:
         result = parse_variable_declaration(s)
         assert result.code == ErrorCode.TYPE_ERROR
 
+    def test_catch_trailing_characters(self):
+        s = 'float num 12abc'
+        result = parse_variable_declaration(s)
+        assert result.code == ErrorCode.TYPE_ERROR
+
     def test_all_nans(self):
         nans = [
             'float num nan',
@@ -104,6 +178,24 @@ class TestFloatDeclarations:
             result = parse_variable_declaration(inf)
             assert isinf(result.value)
 
+    def test_catch_nan_inf_lookalikes(self):
+        cases = [
+            'float num bad # info',
+            'float num oops # financial',
+            'float num infinitesimal',
+            'float num banana'
+        ]
+        for s in cases:
+            result = parse_variable_declaration(s)
+            assert result.code == ErrorCode.TYPE_ERROR
+
+    def test_signed_infs(self):
+        result = parse_variable_declaration('float num -inf')
+        assert result == Variable('num', float('-inf'))
+
+        result = parse_variable_declaration('float num -1.#INF')
+        assert result == Variable('num', float('-inf'))
+
     def test_positive_signed_floats(self):
         cases = [
             'float num +14.51',
@@ -215,6 +307,16 @@ class TestStringDeclarations:
         result = parse_variable_declaration(s)
         assert result == Variable('message', '  . (451)-hello eVery_one ')
 
+    def test_comment_with_quotes(self):
+        s = 'string message "hello" # say "hi"'
+        result = parse_variable_declaration(s)
+        assert result == Variable('message', 'hello')
+
+    def test_catch_junk_after_string(self):
+        s = 'string message "hello" world'
+        result = parse_variable_declaration(s)
+        assert result.code == ErrorCode.TYPE_ERROR
+
     def test_nullable_generic_string(self):
         s = 'string? message null'
         result = parse_variable_declaration(s)
@@ -246,6 +348,11 @@ class TestBooleanDeclarations:
         result = parse_variable_declaration(s)
         assert result == Variable('is_happy', True)
 
+    def test_catch_trailing_characters(self):
+        s = 'boolean is_happy trueish'
+        result = parse_variable_declaration(s)
+        assert result.code == ErrorCode.TYPE_ERROR
+
     def test_nullable_generic_boolean(self):
         s = 'boolean? is_happy null'
         result = parse_variable_declaration(s)
@@ -265,3 +372,76 @@ class TestBooleanDeclarations:
         s = 'boolean is_happy 14.51'
         result = parse_variable_declaration(s)
         assert result.code == ErrorCode.TYPE_ERROR
+
+class TestLoads:
+    def test_loads_string(self):
+        assert loads(DOCUMENT) == EXPECTED
+
+    def test_loads_bytes(self):
+        assert loads(DOCUMENT.encode('utf-8')) == EXPECTED
+
+    def test_loads_matches_load(self):
+        document = '%% 0.2.0\nstring s "a\x0cb"\nstring t "c\u2028d"\n'
+        assert loads(document) == load(StringIO(document))
+        assert loads(document) == {'s': 'a\x0cb', 't': 'c\u2028d'}
+
+    def test_ragged_table_rows(self):
+        document = loads(
+            '%% 0.2.0\n'
+            'table t\n'
+            'integer,integer,string\n'
+            '1,2\n'
+            '3,4,"x",5\n'
+            '  6 ,  7 ,  "y"  \n'
+        )
+        assert document['t']['values'] == [[1, 2], [3, 4, 'x'], [6, 7, 'y']]
+
+    def test_large_string_cell(self):
+        cell = 'x' * 200_000
+        document = loads(f'%% 0.2.0\ntable t\ninteger,string\n1,"{cell}"\n')
+        assert document == {'t': {'header': None, 'values': [[1, cell]]}}
+
+    def test_loads_empty_document(self):
+        assert loads('') == {}
+        assert loads(b'') == {}
+
+    def test_loads_without_frontmatter(self):
+        assert loads('integer x 1\nfloat y 2.5\n') == {'x': 1, 'y': 2.5}
+
+    def test_loads_truncated_table(self):
+        for document in ('%% 0.2.0\ntable t\n', b'%% 0.2.0\ntable+ t\ninteger'):
+            with pytest.raises(ParsingError) as e:
+                loads(document)
+            assert e.value.args[0].code == ErrorCode.PARSING_ERROR
+
+    def test_load_without_frontmatter(self):
+        assert load(StringIO('integer x 1\n')) == {'x': 1}
+        assert load(StringIO('integer x 1\n')) == dict(load_iter(StringIO('integer x 1\n')))
+
+    def test_load_truncated_table(self):
+        for document in ('%% 0.2.0\ntable t\n', '%% 0.2.0\ntable+ t\ninteger\n'):
+            with pytest.raises(ParsingError) as e:
+                load(StringIO(document))
+            assert e.value.args[0].code == ErrorCode.PARSING_ERROR
+
+class TestLoadIter:
+    def test_load_iter(self):
+        document = {}
+        for name, value in load_iter(iter(DOCUMENT.splitlines())):
+            if isinstance(value, dict):
+                value = {'header': value['header'], 'values': list(value['values'])}
+            document[name] = value
+        assert document == EXPECTED
+
+    def test_skip_unconsumed_rows(self):
+        names = [name for name, _ in load_iter(iter(DOCUMENT.splitlines()))]
+        assert names == ['my_int', 'name', 'students', 'my_float']
+
+    def test_empty_document(self):
+        assert list(load_iter(iter([]))) == []
+
+    def test_truncated_table(self):
+        for lines in (['%% 0.2.0', 'table t'], ['%% 0.2.0', 'table+ t', 'integer']):
+            with pytest.raises(ParsingError) as e:
+                list(load_iter(iter(lines)))
+            assert e.value.args[0].code == ErrorCode.PARSING_ERROR